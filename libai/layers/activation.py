@@ -13,6 +13,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import functools
 from enum import Enum
 from typing import Optional
 
@@ -30,14 +31,15 @@ class Activation(str, Enum):
     QuickGELU = "quick_gelu"
 
 
-# For unit testing / parity comparisons, probably not the fastest way
 class SquaredReLU(nn.Module):
     def __init__(self) -> None:
         super().__init__()
 
     def forward(self, x: flow.Tensor) -> flow.Tensor:
-        x_ = flow._C.relu(x)
-        return x_ * x_
+        """SquaredReLU is computed with: flow.square(flow.relu(x)) in a single
+        fused elementwise kernel, without materializing the intermediate relu output.
+        """
+        return flow._C.square_relu(x)
 
 
 class Passthrough(nn.Module):
@@ -55,8 +57,11 @@ class GeLUTanh(nn.Module):
     def forward(self, x: flow.Tensor) -> flow.Tensor:
         """When the approximate argument is 'tanh', Gelu is estimated with:
         0.5 * x * (1.0 + flow.tanh(math.sqrt(2.0 / math.pi) * (x + 0.044715 * flow.pow(x, 3.0))))
+
+        It is dispatched to the fused ``fast_gelu`` kernel directly. Use ``Activation.GeLU``
+        for the exact erf-based Gelu.
         """
-        return flow.nn.functional.gelu(x, approximate="tanh")
+        return flow._C.fast_gelu(x)
 
 
 class QuickGELU(nn.Module):
@@ -64,23 +69,56 @@ class QuickGELU(nn.Module):
         super().__init__()
 
     def forward(self, x: flow.Tensor) -> flow.Tensor:
-        return x * flow.sigmoid(1.702 * x)
+        """QuickGELU is estimated with: x * flow.sigmoid(1.702 * x),
+        computed by a single fused elementwise kernel.
+        """
+        return flow._C.quick_gelu(x)
+
+
+_ACTIVATION_CLS = {
+    Activation.ReLU: nn.ReLU,
+    Activation.GeLU: nn.GELU,
+    Activation.GeLUTanh: GeLUTanh,
+    Activation.LeakyReLU: nn.LeakyReLU,
+    Activation.SquaredReLU: SquaredReLU,
+    Activation.Tanh: nn.Tanh,
+    Activation.QuickGELU: QuickGELU,
+}
+
+# Activations without parameters. ``build_activation`` returns one shared instance of
+# each, so the same module object is owned by every layer that builds it, across all
+# pipeline stages. Forward hooks registered on it fire for all of those layers, and its
+# attributes (e.g. ``nn.GELU.approximate``, ``nn.ReLU.inplace``) must not be mutated;
+# instantiate the class directly when a layer needs its own copy.
+_STATELESS_ACTIVATIONS = frozenset(
+    (
+        Activation.ReLU,
+        Activation.GeLU,
+        Activation.GeLUTanh,
+        Activation.SquaredReLU,
+        Activation.Tanh,
+        Activation.QuickGELU,
+    )
+)
+
+
+@functools.lru_cache(maxsize=None)
+def _stateless_instance(cls):
+    return cls()
 
 
 def build_activation(activation: Optional[Activation]):
     """
     Fetching activation layers by name, e.g.,
     ``build_activation("gelu")`` returns ``nn.GELU()`` module.
+
+    Activations without parameters are returned as shared instances, only ``LeakyReLU``
+    is created for every call. Instantiate the module directly to get a private copy.
     """
     if not activation:
-        return Passthrough()
-
-    return {
-        Activation.ReLU: nn.ReLU,
-        Activation.GeLU: nn.GELU,
-        Activation.GeLUTanh: GeLUTanh,
-        Activation.LeakyReLU: nn.LeakyReLU,
-        Activation.SquaredReLU: SquaredReLU,
-        Activation.Tanh: nn.Tanh,
-        Activation.QuickGELU: QuickGELU,
-    }[activation]()
+        return _stateless_instance(Passthrough)
+
+    cls = _ACTIVATION_CLS[activation]
+    if activation in _STATELESS_ACTIVATIONS:
+        return _stateless_instance(cls)
+    return cls()
@@ -13,55 +13,79 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
+
 import oneflow as flow
 from oneflow import nn
 
 from libai.utils import distributed as dist
 
+# Checking input shapes costs host time on every forward, only do it when debugging.
+_DEBUG_SHAPES = os.getenv("LIBAI_DEBUG_SHAPES") == "1"
+
 
 class LayerNorm(nn.Module):
     """Applies Layer Normalization over a mini-batch of inputs in 1D parallelism.
 
+    The forward is a single call into OneFlow's fused layer norm kernel, which computes
+    mean and variance with a one-pass Welford reduction and applies the affine transform
+    in the same kernel, so the input is read from device memory only once per row
+    when it fits on-chip.
+
     Args:
         normalized_shape: input shape from an expected input of size.
         eps: a value added to the denominator for numerical stability. Defaults to 1e-5.
-            elementwise_affine: a boolean value that when set to ``True``, this module
-            has learnable per-element affine parameters initialized to ones (for weights)
-            and zeros (for biases). Default: ``True``.
         elementwise_affine: a boolean value that when set to ``True``, this module
             has learnable per-element affine parameters initialized to ones (for weights)
             and zeros (for biases). Default: ``True``.
         bias: If set to ``False``, the layer will not learn an additive bias. Defaults to ``True``.
         layer_idx: a layer_idx sign which determines the placement. It will be used in pipeline
             parallelism. Defaults to 0.
+        param_dtype: the dtype of ``weight`` and ``bias``. Storing them in ``flow.float16``
+            or ``flow.bfloat16`` halves the parameter reads when the inputs have the same
+            dtype. For inputs of another dtype, e.g. float32 inputs under mixed precision,
+            ``weight`` and ``bias`` are cast to the input dtype on every forward, which costs
+            an extra cast per call instead of saving bandwidth. Defaults to ``flow.float32``.
     """
 
     def __init__(
-        self, normalized_shape, eps=1e-5, elementwise_affine=True, bias=True, *, layer_idx=0
+        self,
+        normalized_shape,
+        eps=1e-5,
+        elementwise_affine=True,
+        bias=True,
+        *,
+        layer_idx=0,
+        param_dtype=flow.float32,
     ):
         super().__init__()
-        if isinstance(normalized_shape, int):
-            normalized_shape = (normalized_shape,)
-        self.normalized_shape = tuple(normalized_shape)
+        self.normalized_shape = (
+            (normalized_shape,) if isinstance(normalized_shape, int) else tuple(normalized_shape)
+        )
+        self._norm_ndim = len(self.normalized_shape)
         self.eps = eps
         self.elementwise_affine = elementwise_affine
         self.layer_idx = layer_idx
+        # Only non-default parameter dtypes pay for the dtype check on forward.
+        self._cast_params = elementwise_affine and param_dtype != flow.float32
+        # Set by ``compile`` for a static input rank.
+        self._begin_norm_axis = None
 
         if elementwise_affine:
             self.weight = nn.Parameter(
                 flow.ones(
-                    normalized_shape,
-                    dtype=flow.float32,
+                    self.normalized_shape,
+                    dtype=param_dtype,
                     placement=dist.get_layer_placement(layer_idx),
-                    sbp=dist.get_nd_sbp([flow.sbp.broadcast, flow.sbp.broadcast]),
+                    sbp=dist.get_broadcast_sbp(),
                 )
             )
             self.bias = nn.Parameter(
                 flow.zeros(
-                    normalized_shape,
-                    dtype=flow.float32,
+                    self.normalized_shape,
+                    dtype=param_dtype,
                     placement=dist.get_layer_placement(layer_idx),
-                    sbp=dist.get_nd_sbp([flow.sbp.broadcast, flow.sbp.broadcast]),
+                    sbp=dist.get_broadcast_sbp(),
                 ),
                 requires_grad=bias,
             )
@@ -70,26 +94,53 @@ class LayerNorm(nn.Module):
             self.bias = None
 
     def forward(self, x):
-        assert x.shape[-len(self.normalized_shape) :] == self.normalized_shape
-        begin_norm_axis = x.ndim - len(self.normalized_shape)
-        begin_params_axis = x.ndim - len(self.normalized_shape)
+        if __debug__ and _DEBUG_SHAPES:
+            assert x.shape[-self._norm_ndim :] == self.normalized_shape
+        # Dispatch through ``self`` rather than callables stored on the module, so that
+        # nn.Graph resolves the parameters of its own module block.
+        begin_norm_axis = self._begin_norm_axis
+        if begin_norm_axis is None:
+            begin_norm_axis = x.ndim - self._norm_ndim
         if self.elementwise_affine:
-            y = flow._C.layer_norm_affine(
-                x,
-                self.weight,
-                self.bias,
-                begin_norm_axis=begin_norm_axis,
-                begin_params_axis=begin_params_axis,
-                epsilon=self.eps,
-            )
-        else:
-            y = flow._C.layer_norm(
-                x,
-                begin_norm_axis=begin_norm_axis,
-                begin_params_axis=begin_params_axis,
-                epsilon=self.eps,
-            )
-        return y
+            return self._layer_norm_affine(x, begin_norm_axis)
+        return self._layer_norm_plain(x, begin_norm_axis)
+
+    def compile(self, input_shape):
+        """Specialize the forward for a static input shape, e.g. ``(B, S, H)``.
+
+        ``begin_norm_axis`` is precomputed and stored as a plain attribute, so the forward
+        skips the ndim arithmetic, which keeps per-step host work low for fixed shapes,
+        e.g. under nn.Graph or CUDA Graph capture. The compiled forward assumes inputs of
+        the same rank.
+
+        Returns:
+            the module itself.
+        """
+        input_shape = tuple(input_shape)
+        assert input_shape[-self._norm_ndim :] == self.normalized_shape
+        self._begin_norm_axis = len(input_shape) - self._norm_ndim
+        return self
+
+    def _layer_norm_affine(self, x, begin_norm_axis):
+        weight, bias = self.weight, self.bias
+        if self._cast_params and weight.dtype != x.dtype:
+            weight, bias = weight.to(x.dtype), bias.to(x.dtype)
+        return flow._C.layer_norm_affine(
+            x,
+            weight,
+            bias,
+            begin_norm_axis=begin_norm_axis,
+            begin_params_axis=begin_norm_axis,
+            epsilon=self.eps,
+        )
+
+    def _layer_norm_plain(self, x, begin_norm_axis):
+        return flow._C.layer_norm(
+            x,
+            begin_norm_axis=begin_norm_axis,
+            begin_params_axis=begin_norm_axis,
+            epsilon=self.eps,
+        )
 
     def extra_repr(self) -> str:
         return "{normalized_shape}, eps={eps}, elementwise_affine={elementwise_affine}".format(
@@ -102,28 +153,45 @@ class RMSLayerNorm(nn.Module):
     Root Mean Square Layer Normalization thus varience is calculated w/o mean and
     there is no bias. More details see: https://arxiv.org/abs/1910.07467.
 
+    For a 1D ``normalized_shape`` and inputs of the same dtype as ``weight``, the forward calls
+    OneFlow's fused ``rms_norm`` kernel, which reduces the sum of squares and scales the input
+    by its ``rsqrt`` in a single kernel. Otherwise it keeps using ``rms_layer_norm``, which
+    reduces over the last dimension and promotes mixed input/weight dtypes as before.
+
     Args:
         normalized_shape: input shape from an expected input of size.
-        eps: a value added to the denominator for numerical stability. Defaults to 1e-5.
-            elementwise_affine: a boolean value that when set to ``True``, this module
-            has learnable per-element affine parameters initialized to ones (for weights)
-            and zeros (for biases). Default: ``True``.
+        eps: a value added to the denominator for numerical stability. Defaults to 1e-6.
         layer_idx: a layer_idx sign which determines the placement. It will be used in pipeline
             parallelism. Defaults to 0.
+        param_dtype: the dtype of ``weight``, e.g. ``flow.bfloat16`` to store it at the
+            compute dtype of mixed precision training. Inputs of another dtype don't use the
+            fused kernel and follow the dtype promotion of ``rms_layer_norm``.
+            Defaults to ``flow.float32``.
     """
 
-    def __init__(self, normalized_shape, eps=1e-6, layer_idx=0):
+    def __init__(self, normalized_shape, eps=1e-6, layer_idx=0, *, param_dtype=flow.float32):
         super().__init__()
+        if isinstance(normalized_shape, int):
+            normalized_shape = (normalized_shape,)
+        self.normalized_shape = tuple(normalized_shape)
         self.layer_idx = layer_idx
-        self.weight = flow.nn.Parameter(
+        self.weight = nn.Parameter(
             flow.ones(
                 normalized_shape,
-                dtype=flow.float32,
+                dtype=param_dtype,
                 placement=dist.get_layer_placement(layer_idx),
-                sbp=dist.get_nd_sbp([flow.sbp.broadcast, flow.sbp.broadcast]),
+                sbp=dist.get_broadcast_sbp(),
             )
         )
         self.l2norm_epsilon = eps
+        # rms_norm reduces over all of ``normalized_shape``, which matches
+        # rms_layer_norm's last dimension reduction only for 1D shapes.
+        self._fused = len(self.normalized_shape) == 1
 
     def forward(self, hidden_states):
+        # rms_norm expects matching dtypes, mixed ones keep rms_layer_norm's promotion.
+        if self._fused and self.weight.dtype == hidden_states.dtype:
+            return flow._C.rms_norm(
+                hidden_states, self.weight, self.normalized_shape, epsilon=self.l2norm_epsilon
+            )
         return flow._C.rms_layer_norm(hidden_states, self.weight, self.l2norm_epsilon)
@@ -26,6 +26,11 @@ logger = logging.getLogger(__name__)
 
 _DIST_UTIL = None
 
+# Placements and sbp signatures are immutable, cache them for the current distributed
+# environment. They're reset whenever the environment is set up again.
+_LAYER_PLACEMENT_CACHE = {}
+_BROADCAST_SBP = None
+
 
 def _merge_devices(devices):
     num_gpus_per_node = get_world_size() // get_num_nodes()
@@ -265,8 +270,10 @@ def setup_dist_util(cfg):
         )
 
     """
-    global _DIST_UTIL
+    global _DIST_UTIL, _BROADCAST_SBP
     _DIST_UTIL = _DistributeUtil(cfg)
+    _LAYER_PLACEMENT_CACHE.clear()
+    _BROADCAST_SBP = None
 
 
 def get_dist_util():
@@ -304,10 +311,15 @@ def get_layer_placement(layer_idx, device_type="cuda"):
     dist_util = get_dist_util()
     if not flow.cuda.is_available() and device_type == "cuda":
         device_type = "cpu"
-    return flow.placement(
-        device_type,
-        dist_util.get_layer_ranks(layer_idx),
-    )
+    key = (layer_idx, device_type)
+    placement = _LAYER_PLACEMENT_CACHE.get(key)
+    if placement is None:
+        placement = flow.placement(
+            device_type,
+            dist_util.get_layer_ranks(layer_idx),
+        )
+        _LAYER_PLACEMENT_CACHE[key] = placement
+    return placement
 
 
 def get_nd_sbp(sbp_list):
@@ -334,6 +346,15 @@ def get_nd_sbp(sbp_list):
         return [flow.sbp.broadcast]
 
 
+def get_broadcast_sbp():
+    """Broadcast sbp signature, i.e. memoized ``get_nd_sbp([broadcast, broadcast])``.
+    It's returned as a tuple shared by all the callers."""
+    global _BROADCAST_SBP
+    if _BROADCAST_SBP is None:
+        _BROADCAST_SBP = tuple(get_nd_sbp([flow.sbp.broadcast, flow.sbp.broadcast]))
+    return _BROADCAST_SBP
+
+
 def get_hidden_sbp():
     """Hidden states sbp."""
     return get_nd_sbp([flow.sbp.split(0), flow.sbp.broadcast])
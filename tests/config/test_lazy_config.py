@@ -18,7 +18,10 @@
 Unittests followed
 https://github.com/facebookresearch/detectron2/blob/main/tests/config/test_lazy_config.py
 """
+import copy
+import functools
 import os
+import shutil
 import unittest
 import tempfile
 from itertools import count
@@ -27,9 +30,28 @@ from libai.config import LazyConfig, LazyCall
 from omegaconf import DictConfig
 
 
+ROOT_FILENAME = os.path.join(os.path.dirname(__file__), "root_cfg.py")
+
+
+@functools.lru_cache(maxsize=None)
+def _load_root():
+    # Parse the root config only once, tests must deepcopy it before mutating.
+    return LazyConfig.load(ROOT_FILENAME)
+
+
 class TestLazyPythonConfig(unittest.TestCase):
-    def setUp(self):
-        self.root_filename = os.path.join(os.path.dirname(__file__), "root_cfg.py")
+    @classmethod
+    def setUpClass(cls):
+        cls.root_filename = ROOT_FILENAME
+        cls.tmp_dir = tempfile.mkdtemp(prefix="detectron2")
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp_dir, ignore_errors=True)
+
+    def _mkdtemp(self):
+        # Per test directory so that tests can run in parallel.
+        return tempfile.mkdtemp(prefix=self._testMethodName, dir=self.tmp_dir)
 
     def test_load(self):
         cfg = LazyConfig.load(self.root_filename)
@@ -44,11 +66,10 @@ class TestLazyPythonConfig(unittest.TestCase):
         self.assertEqual(cfg.lazyobj.x, "base_a_1")
 
     def test_save_load(self):
-        cfg = LazyConfig.load(self.root_filename)
-        with tempfile.TemporaryDirectory(prefix="detectron2") as d:
-            fname = os.path.join(d, "test_config.yaml")
-            LazyConfig.save(cfg, fname)
-            cfg2 = LazyConfig.load(fname)
+        cfg = copy.deepcopy(_load_root())
+        fname = os.path.join(self._mkdtemp(), "test_config.yaml")
+        LazyConfig.save(cfg, fname)
+        cfg2 = LazyConfig.load(fname)
 
         self.assertEqual(cfg2.lazyobj._target_, "itertools.count")
         self.assertEqual(cfg.lazyobj._target_, count)
@@ -59,25 +80,24 @@ class TestLazyPythonConfig(unittest.TestCase):
 
     def test_failed_save(self):
         cfg = DictConfig({"x": lambda: 3}, flags={"allow_objects": True})
-        with tempfile.TemporaryDirectory(prefix="detectron2") as d:
-            fname = os.path.join(d, "test_config.yaml")
-            LazyConfig.save(cfg, fname)
-            self.assertTrue(os.path.exists(fname))
-            self.assertTrue(os.path.exists(fname + ".pkl"))
+        fname = os.path.join(self._mkdtemp(), "test_config.yaml")
+        LazyConfig.save(cfg, fname)
+        self.assertTrue(os.path.exists(fname))
+        self.assertTrue(os.path.exists(fname + ".pkl"))
 
     def test_overrides(self):
-        cfg = LazyConfig.load(self.root_filename)
+        cfg = copy.deepcopy(_load_root())
         LazyConfig.apply_overrides(cfg, ["lazyobj.x=123", 'dir1b_dict.a="123"'])
         self.assertEqual(cfg.dir1b_dict.a, "123")
         self.assertEqual(cfg.lazyobj.x, 123)
 
     def test_invalid_overrides(self):
-        cfg = LazyConfig.load(self.root_filename)
+        cfg = copy.deepcopy(_load_root())
         with self.assertRaises(KeyError):
             LazyConfig.apply_overrides(cfg, ["lazyobj.x.xxx=123"])
 
     def test_to_py(self):
-        cfg = LazyConfig.load(self.root_filename)
+        cfg = copy.deepcopy(_load_root())
         cfg.lazyobj.x = {
             "a": 1,
             "b": 2,
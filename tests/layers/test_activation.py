@@ -0,0 +1,80 @@
+# coding=utf-8
+# Copyright 2021 The OneFlow Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import unittest
+
+import numpy as np
+import oneflow as flow
+import oneflow.unittest
+from oneflow import nn
+
+from libai.layers import build_activation
+from libai.layers.activation import Activation, Passthrough, QuickGELU, SquaredReLU
+
+DEVICE = "cuda" if flow.cuda.is_available() else "cpu"
+
+
+class TestActivation(flow.unittest.TestCase):
+    def test_stateless_activation_is_shared(self):
+        self.assertIs(build_activation("gelu"), build_activation(Activation.GeLU))
+        self.assertIs(build_activation("gelu_tanh"), build_activation("gelu_tanh"))
+        self.assertTrue(isinstance(build_activation("gelu"), nn.GELU))
+
+    def test_leaky_relu_is_fresh(self):
+        leaky_relu = build_activation("leaky_relu")
+        self.assertTrue(isinstance(leaky_relu, nn.LeakyReLU))
+        self.assertIsNot(leaky_relu, build_activation(Activation.LeakyReLU))
+
+    def test_passthrough_is_shared(self):
+        passthrough = build_activation(None)
+        self.assertTrue(isinstance(passthrough, Passthrough))
+        self.assertIs(passthrough, build_activation(None))
+        self.assertIs(passthrough, build_activation(""))
+
+    def _check_parity(self, module, reference, dtype, tol):
+        inputs = flow.randn(4, 8, 16, dtype=dtype, device=DEVICE)
+
+        x = inputs.clone().requires_grad_()
+        output = module(x)
+        output.sum().backward()
+
+        ref_x = inputs.clone().requires_grad_()
+        ref_output = reference(ref_x)
+        ref_output.sum().backward()
+
+        self.assertEqual(output.dtype, ref_output.dtype)
+        self.assertTrue(
+            np.allclose(output.float().numpy(), ref_output.float().numpy(), tol, tol)
+        )
+        self.assertTrue(np.allclose(x.grad.float().numpy(), ref_x.grad.float().numpy(), tol, tol))
+
+    def test_quick_gelu(self):
+        self._check_parity(QuickGELU(), lambda x: x * flow.sigmoid(1.702 * x), flow.float32, 1e-5)
+
+    @unittest.skipIf(not flow.cuda.is_available(), "only test gpu cases")
+    def test_quick_gelu_half(self):
+        self._check_parity(QuickGELU(), lambda x: x * flow.sigmoid(1.702 * x), flow.float16, 1e-2)
+
+    def test_squared_relu(self):
+        self._check_parity(SquaredReLU(), lambda x: flow.relu(x) ** 2, flow.float32, 1e-5)
+
+    @unittest.skipIf(not flow.cuda.is_available(), "only test gpu cases")
+    def test_squared_relu_half(self):
+        self._check_parity(SquaredReLU(), lambda x: flow.relu(x) ** 2, flow.float16, 1e-2)
+
+
+if __name__ == "__main__":
+    unittest.main()
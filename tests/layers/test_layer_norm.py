@@ -0,0 +1,172 @@
+# coding=utf-8
+# Copyright 2021 The OneFlow Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import unittest
+
+import numpy as np
+import oneflow as flow
+import oneflow.unittest
+from omegaconf import DictConfig
+from oneflow import nn
+
+from libai.layers import LayerNorm, RMSLayerNorm
+from libai.utils import distributed as dist
+
+
+class _TrainGraph(nn.Graph):
+    def __init__(self, model, optimizer):
+        super().__init__()
+        self.model = model
+        self.add_optimizer(optimizer)
+
+    def build(self, inputs, target):
+        loss = (self.model(inputs) * target).sum()
+        loss.backward()
+        return loss
+
+
+class TestLayerNorm(flow.unittest.TestCase):
+    def setUp(self):
+        dist.setup_dist_util(
+            DictConfig(
+                dict(
+                    data_parallel_size=1,
+                    tensor_parallel_size=1,
+                    pipeline_parallel_size=1,
+                )
+            )
+        )
+
+    def _check_graph_train_step(self, layer_norm):
+        placement = dist.get_layer_placement(0)
+        inputs = flow.rand(4, 8, 16, sbp=flow.sbp.broadcast, placement=placement)
+        target = flow.rand(4, 8, 16, sbp=flow.sbp.broadcast, placement=placement)
+
+        weight = dist.tton(layer_norm.weight)
+        bias = dist.tton(layer_norm.bias)
+        graph = _TrainGraph(layer_norm, flow.optim.SGD(layer_norm.parameters(), lr=0.1))
+        graph(inputs, target)
+
+        # the affine parameters are graph variables updated by the optimizer
+        self.assertFalse(np.allclose(weight, dist.tton(layer_norm.weight)))
+        self.assertFalse(np.allclose(bias, dist.tton(layer_norm.bias)))
+
+    @flow.unittest.skip_unless_1n1d()
+    def test_layer_norm_graph_train_step(self):
+        self._check_graph_train_step(LayerNorm(16))
+
+    @unittest.skipIf(not flow.cuda.is_available(), "only test gpu cases")
+    @flow.unittest.skip_unless_1n1d()
+    def test_half_param_dtype(self):
+        placement = dist.get_layer_placement(0)
+        for dtype in (flow.float16, flow.bfloat16):
+            for norm in (LayerNorm(16, param_dtype=dtype), RMSLayerNorm(16, param_dtype=dtype)):
+                self.assertEqual(norm.weight.dtype, dtype)
+                inputs = flow.rand(
+                    4, 8, 16, dtype=dtype, sbp=flow.sbp.broadcast, placement=placement
+                ).requires_grad_()
+                output = norm(inputs)
+                self.assertEqual(output.dtype, dtype)
+
+                output.sum().backward()
+                self.assertEqual(inputs.grad.dtype, dtype)
+                self.assertEqual(norm.weight.grad.dtype, dtype)
+
+            # float32 inputs with half parameters compute in float32
+            inputs = flow.rand(4, 8, 16, sbp=flow.sbp.broadcast, placement=placement)
+            self.assertEqual(LayerNorm(16, param_dtype=dtype)(inputs).dtype, flow.float32)
+
+    @flow.unittest.skip_unless_1n1d()
+    def test_rms_layer_norm_parity(self):
+        # runs on the cpu placement when cuda is not available
+        placement = dist.get_layer_placement(0)
+        for normalized_shape in (16, (8, 16)):
+            inputs = flow.rand(4, 8, 16, sbp=flow.sbp.broadcast, placement=placement)
+            weight = flow.rand(normalized_shape, sbp=flow.sbp.broadcast, placement=placement)
+
+            rms_norm = RMSLayerNorm(normalized_shape, eps=1e-6)
+            rms_norm.weight.data.copy_(weight)
+            output = rms_norm(inputs)
+
+            # T5 layer norm: only the last dimension is reduced, without the mean
+            variance = inputs.pow(2).mean(-1, keepdim=True)
+            expected = weight * (inputs * flow.rsqrt(variance + 1e-6))
+
+            self.assertEqual(output.dtype, flow.float32)
+            self.assertTrue(np.allclose(dist.tton(output), dist.tton(expected), 1e-5, 1e-5))
+
+    @unittest.skipIf(not flow.cuda.is_available(), "only test gpu cases")
+    @flow.unittest.skip_unless_1n1d()
+    def test_rms_layer_norm_half_input(self):
+        placement = dist.get_layer_placement(0)
+        inputs = flow.rand(4, 8, 16, sbp=flow.sbp.broadcast, placement=placement).half()
+        weight = flow.rand(16, sbp=flow.sbp.broadcast, placement=placement)
+
+        # half inputs with the default float32 weight keep rms_layer_norm's behaviour
+        rms_norm = RMSLayerNorm(16, eps=1e-6)
+        rms_norm.weight.data.copy_(weight)
+        output = rms_norm(inputs)
+        expected = flow._C.rms_layer_norm(inputs, weight, 1e-6)
+        self.assertEqual(output.dtype, expected.dtype)
+        self.assertTrue(np.allclose(dist.tton(output), dist.tton(expected), 0, 0))
+
+        # matching half dtypes use the fused kernel
+        rms_norm = RMSLayerNorm(16, eps=1e-6, param_dtype=flow.float16)
+        rms_norm.weight.data.copy_(weight.half())
+        output = rms_norm(inputs)
+        expected = flow._C.rms_layer_norm(inputs.float(), weight.half().float(), 1e-6)
+        self.assertEqual(output.dtype, flow.float16)
+        self.assertTrue(
+            np.allclose(dist.tton(output.float()), dist.tton(expected), 1e-2, 1e-2)
+        )
+
+    @flow.unittest.skip_unless_1n1d()
+    def test_compiled_layer_norm(self):
+        placement = dist.get_layer_placement(0)
+        inputs = flow.rand(4, 8, 16, sbp=flow.sbp.broadcast, placement=placement)
+        weight = flow.rand(16, sbp=flow.sbp.broadcast, placement=placement)
+        bias = flow.rand(16, sbp=flow.sbp.broadcast, placement=placement)
+
+        for elementwise_affine in (True, False):
+            layer_norm = LayerNorm(16, elementwise_affine=elementwise_affine)
+            if elementwise_affine:
+                layer_norm.weight.data.copy_(weight)
+                layer_norm.bias.data.copy_(bias)
+            output = layer_norm(inputs)
+
+            compiled_output = layer_norm.compile((4, 8, 16))(inputs)
+            self.assertTrue(np.allclose(dist.tton(output), dist.tton(compiled_output), 1e-7, 1e-7))
+
+    @unittest.skipIf(not flow.cuda.is_available(), "only test gpu cases")
+    @flow.unittest.skip_unless_1n1d()
+    def test_compiled_layer_norm_half_param_dtype(self):
+        placement = dist.get_layer_placement(0)
+        inputs = flow.rand(4, 8, 16, sbp=flow.sbp.broadcast, placement=placement)
+
+        layer_norm = LayerNorm(16, param_dtype=flow.bfloat16)
+        output = layer_norm(inputs)
+        compiled_output = layer_norm.compile((4, 8, 16))(inputs)
+
+        self.assertEqual(compiled_output.dtype, output.dtype)
+        self.assertTrue(np.allclose(dist.tton(output), dist.tton(compiled_output), 1e-7, 1e-7))
+
+    @flow.unittest.skip_unless_1n1d()
+    def test_compiled_layer_norm_graph_train_step(self):
+        self._check_graph_train_step(LayerNorm(16).compile((4, 8, 16)))
+
+
+if __name__ == "__main__":
+    unittest.main()
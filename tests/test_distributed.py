@@ -0,0 +1,79 @@
+# coding=utf-8
+# Copyright 2021 The OneFlow Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import unittest
+
+import oneflow as flow
+import oneflow.unittest
+from omegaconf import DictConfig
+
+from libai.utils import distributed as dist
+
+
+class TestDistributedCache(flow.unittest.TestCase):
+    @flow.unittest.skip_unless_1n1d()
+    def test_cache_reset_on_single_device(self):
+        cfg = dict(data_parallel_size=1, tensor_parallel_size=1, pipeline_parallel_size=1)
+        dist.setup_dist_util(DictConfig(cfg))
+        placement = dist.get_layer_placement(0)
+        broadcast_sbp = dist.get_broadcast_sbp()
+        self.assertIs(dist.get_layer_placement(0), placement)
+        self.assertIs(dist.get_broadcast_sbp(), broadcast_sbp)
+        self.assertTrue(isinstance(broadcast_sbp, tuple))
+
+        # setting up the same environment again still drops the cached objects
+        dist.setup_dist_util(DictConfig(cfg))
+        self.assertIsNot(dist.get_layer_placement(0), placement)
+        self.assertIsNot(dist.get_broadcast_sbp(), broadcast_sbp)
+        self.assertEqual(dist.get_broadcast_sbp(), broadcast_sbp)
+
+    @flow.unittest.skip_unless_1n4d()
+    def test_cache_reset_by_setup_dist_util(self):
+        dist.setup_dist_util(
+            DictConfig(
+                dict(
+                    data_parallel_size=2,
+                    tensor_parallel_size=2,
+                    pipeline_parallel_size=1,
+                )
+            )
+        )
+        placement = dist.get_layer_placement(0)
+        broadcast_sbp = dist.get_broadcast_sbp()
+        # cached within the same environment
+        self.assertIs(dist.get_layer_placement(0), placement)
+        self.assertIs(dist.get_broadcast_sbp(), broadcast_sbp)
+        self.assertEqual(len(broadcast_sbp), 2)
+
+        dist.setup_dist_util(
+            DictConfig(
+                dict(
+                    data_parallel_size=1,
+                    tensor_parallel_size=1,
+                    pipeline_parallel_size=4,
+                    pipeline_num_layers=4,
+                )
+            )
+        )
+        new_placement = dist.get_layer_placement(0)
+        new_broadcast_sbp = dist.get_broadcast_sbp()
+        self.assertNotEqual(new_placement.ranks.tolist(), placement.ranks.tolist())
+        self.assertEqual(new_placement.ranks.tolist(), [0])
+        self.assertEqual(new_broadcast_sbp, (flow.sbp.broadcast,))
+
+
+if __name__ == "__main__":
+    unittest.main()